@@ -1,10 +1,27 @@
 import os
+import sys
+import tempfile
 from contextlib import redirect_stdout
+from multiprocessing import shared_memory
 
+from csp import CSP
 from cutset import solve_with_cutset
+from shared_csp import CompiledCSP, SharedCompiledCSP, compile_csp, solve_compiled_range, solve_with_cutset_parallel
 from mapcolor import australia_csp, europe_simplified_csp, usa_simplified_csp
 from cryptarithmetic import send_more_money_csp, t_plus_t_eq_ee_csp, two_two_two_eq_six_csp
 
+MAP_INSTANCES = [
+    ("Australia", australia_csp),
+    ("Europa_semplificata", europe_simplified_csp),
+    ("USA_semplificata", usa_simplified_csp)
+]
+
+CRYPT_INSTANCES = [
+    ("T+T=EE", t_plus_t_eq_ee_csp),
+    ("SEND+MORE=MONEY", send_more_money_csp),
+    ("TWO+TWO+TWO=SIX", two_two_two_eq_six_csp)
+]
+
 def save_file_log(name, func):
     os.makedirs("logs_of_istances", exist_ok=True)
     path = f"logs_of_istances/{name}.txt"
@@ -16,19 +33,96 @@ def save_file_log(name, func):
 
     print(f"Log di '{name}' scritto in: {path}")
 
+def check_parallel():
+    # Confronta il risolutore sequenziale con quello su memoria condivisa: le soluzioni devono coincidere
+    all_equal = True
+    for name, func in [(f"Mappa_{n}", f) for n, f in MAP_INSTANCES] + [(f"Cryptoaritmetica_{n}", f) for n, f in CRYPT_INSTANCES]:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            sequential = solve_with_cutset(func())
+            parallel = solve_with_cutset_parallel(func())
+        equal = sequential == parallel
+        all_equal = all_equal and equal
+        # le soluzioni coincidono anche quando violano un vincolo n-ario misto, che nessuno dei due verifica
+        valid = "" if parallel is None else f", valida={satisfies(func(), parallel)}"
+        print(f"{name}: {'OK' if equal else 'DIVERSE'} (sequenziale={sequential}, parallelo={parallel}{valid})")
+    return all_equal
+
+def wide_domain_csp():
+    """
+    Istanza di controllo per la forma compilata: A e B hanno 70 valori (bitmask su due parole da 64 bit),
+    il vincolo n-ario A+B+C == 100 è tutto dentro il cutset [A, B, C] e D resta nel residuo.
+    """
+    variables = ['A','B','C','D']
+    domains = {'A': list(range(70)), 'B': list(range(70)), 'C': list(range(3)), 'D': list(range(70))}
+    constraints = [
+        (('A','B'), lambda a,b: a < b),
+        (('A','B','C'), lambda a,b,c: a + b + c == 100),
+        (('C','D'), lambda c,d: d == 65 + c),
+        (('B','D'), lambda b,d: b != d)]
+    return CSP(variables, domains, constraints)
+
+def satisfies(csp_instance, solution):
+    # Verifica diretta di tutti i vincoli sulla soluzione completa
+    return solution is not None and all(func(*[solution[v] for v in vars_tuple]) for vars_tuple, func in csp_instance.constraints)
+
+def raises_value_error(func):
+    try:
+        func()
+    except ValueError:
+        return True
+    return False
+
+def check_compiled():
+    # Controlli sulla forma compilata che le istanze di main non coprono
+    wide_cutset = ['A','B','C']
+    triangle = CSP(['A','B','C'], {v: ['R','G'] for v in 'ABC'},
+                   [((a, b), lambda x,y: x != y) for a, b in [('A','B'),('B','C'),('C','A')]])
+    unpruned = CSP(list('ABCDEFGH'), {v: list(range(10)) for v in 'ABCDEFGH'},
+                   [(tuple('ABCDEFGH'), lambda *values: sum(values) == 0)])
+    checks = []
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        parallel = solve_with_cutset_parallel(wide_domain_csp(), cutset_variables=wide_cutset)
+    checks.append(("domini oltre 64 valori e vincolo n-ario nel cutset",
+                   satisfies(wide_domain_csp(), parallel) and parallel == {'A': 29, 'B': 69, 'C': 2, 'D': 67}))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "wide.csp")
+        with open(path, "wb") as f:
+            f.write(compile_csp(wide_domain_csp(), cutset_variables=wide_cutset))
+        with CompiledCSP.from_file(path) as compiled:
+            nary = next(c for c in compiled.cutset_cons if len(compiled.scope(c)) == 3)
+            from_file = compiled.decode(solve_compiled_range(compiled, 0, compiled.cutset_combinations()))
+            checks.append(("allows() sul vincolo n-ario", compiled.allows(nary, (29, 69, 2)) and not compiled.allows(nary, (29, 69, 1))))
+        checks.append(("CompiledCSP.from_file", from_file == parallel))
+
+    checks.append(("limite max_table_candidates",
+                   raises_value_error(lambda: compile_csp(unpruned, cutset_variables=list('ABCDEFGH'), max_table_candidates=10))))
+    checks.append(("cutset con residuo ciclico", raises_value_error(lambda: compile_csp(triangle, cutset_variables=[]))))
+
+    shared = SharedCompiledCSP.create(triangle)
+    name = shared.name
+    shared.scope(0), shared.neighbours(0)
+    shared.close()
+    try:
+        shared_memory.SharedMemory(name=name).close()
+        unlinked = False
+    except FileNotFoundError:
+        unlinked = True
+    checks.append(("close() rimuove il blocco condiviso", unlinked))
+
+    for name, ok in checks:
+        print(f"{name}: {'OK' if ok else 'FALLITO'}")
+    return all(ok for _, ok in checks)
+
 def main():
-    for name, map in [
-        ("Australia", australia_csp),
-        ("Europa_semplificata", europe_simplified_csp),
-        ("USA_semplificata", usa_simplified_csp)
-    ]:
+    if "--check-parallel" in sys.argv[1:]:
+        sys.exit(0 if check_parallel() & check_compiled() else 1)
+
+    for name, map in MAP_INSTANCES:
         save_file_log(f"Mappa_{name}", map)
 
-    for name, crypt in [
-        ("T+T=EE", t_plus_t_eq_ee_csp),
-        ("SEND+MORE=MONEY", send_more_money_csp),
-        ("TWO+TWO+TWO=SIX", two_two_two_eq_six_csp)
-    ]:
+    for name, crypt in CRYPT_INSTANCES:
         save_file_log(f"Cryptoaritmetica_{name}", crypt)
 
 if __name__ == "__main__":
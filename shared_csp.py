@@ -0,0 +1,653 @@
+# Definizione della forma compilata di un CSP in memoria condivisa
+
+# Compila un'istanza CSP in un unico buffer piatto (senza lambda né dict annidati) con:
+#  - id interi per variabili e valori
+#  - bitmask dei domini (già ridotti dai vincoli unari)
+#  - tabelle dei vincoli: righe di bitmask per i binari, chiavi ordinate delle tuple ammesse per gli n-ari
+#  - liste di adiacenza in formato CSR (offset + vicini + id del vincolo)
+#  - piano del cutset: variabili del cutset, variabili residue, vincoli interni al cutset e vincoli binari misti
+# Il buffer può stare in un blocco multiprocessing.shared_memory oppure in un file mappato con mmap:
+# i worker vi si collegano in sola lettura, senza copiare l'istanza.
+
+import bisect
+import mmap
+import os
+import pickle
+import struct
+from array import array
+from multiprocessing import Pool, shared_memory
+
+from cutset import find_cycle_cutset_min_fill, is_graph_acyclic_via_leaf_pruning
+
+MAGIC = b'CSPSHM01'
+
+# Sezioni del buffer, nell'ordine in cui vengono scritte.
+# Tutte sono array di interi a 64 bit ('q' con segno, 'Q' senza segno) tranne 'labels' (pickle dei nomi).
+SECTIONS = (
+    ('dom_offsets', 'q'),    # n_vars + 1 offset in dom_values
+    ('dom_values', 'q'),     # id globali dei valori, dominio per dominio
+    ('dom_masks', 'Q'),      # n_vars * words parole: bitmask delle posizioni ammesse nel dominio
+    ('scope_offsets', 'q'),  # n_cons + 1 offset in scopes
+    ('scopes', 'q'),         # id delle variabili di ogni vincolo
+    ('table_offsets', 'q'),  # n_cons + 1 offset (in parole) in tables
+    ('tables', 'Q'),         # binari: righe avanti e indietro; n-ari: chiavi ordinate
+    ('adj_offsets', 'q'),    # n_vars + 1 offset in adj_vars/adj_cons
+    ('adj_vars', 'q'),       # vicini di ogni variabile (solo vincoli binari)
+    ('adj_cons', 'q'),       # id del vincolo binario che collega la variabile al vicino
+    ('cutset', 'q'),         # id delle variabili del cutset, nell'ordine del cutset
+    ('cutset_index', 'q'),   # per ogni variabile: posizione nel cutset oppure -1 se residua
+    ('residual', 'q'),       # id delle variabili residue, nell'ordine originale
+    ('cutset_cons', 'q'),    # vincoli con tutte le variabili nel cutset
+    ('mixed_cons', 'q'),     # vincoli binari tra una variabile del cutset e una residua
+    ('labels', 'B'),         # pickle di (nomi delle variabili, valori)
+)
+
+# magic, n_vars, n_cons, words e poi (offset, lunghezza in byte) per ogni sezione
+HEADER = struct.Struct('<8sQQQ' + 'QQ' * len(SECTIONS))
+
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+
+# Numero massimo di candidati (tuple parziali e complete) visitati per tabulare un vincolo n-ario
+DEFAULT_MAX_TABLE_CANDIDATES = 1_000_000
+
+
+def _holds(func, *values):
+    # Come in cutset.py e tree_solver.py: se il vincolo solleva un'eccezione la combinazione non è valida
+    try:
+        return bool(func(*values))
+    except Exception:
+        return False
+
+def _iter_bits(mask):
+    # Restituisce le posizioni dei bit a 1, dalla più bassa alla più alta
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _lowest_bit(mask):
+    return (mask & -mask).bit_length() - 1
+
+def _mask_to_words(mask, words):
+    return [(mask >> (WORD_BITS * w)) & WORD_MASK for w in range(words)]
+
+
+def compile_csp(csp_instance, cutset_variables=None, max_table_candidates=DEFAULT_MAX_TABLE_CANDIDATES):
+    """
+    Compila csp_instance nel buffer piatto descritto da SECTIONS e lo restituisce come bytes.
+    Tutte le funzioni dei vincoli vengono valutate qui, una volta sola: nel buffer restano solo interi.
+     - i vincoli unari riducono direttamente le bitmask dei domini
+     - i vincoli binari sulla stessa coppia di variabili vengono fusi (AND delle tabelle)
+     - i vincoli n-ari interni al cutset diventano l'elenco ordinato delle tuple ammesse, enumerate
+       potando con domini e vincoli binari; se i candidati visitati superano max_table_candidates
+       si solleva ValueError
+    Se cutset_variables è None il cutset viene calcolato con find_cycle_cutset_min_fill; un cutset
+    che lascia cicli nel residuo solleva ValueError.
+    I valori dei domini devono essere hashable, altrimenti si solleva ValueError.
+
+    Limitazione: i vincoli n-ari che coinvolgono sia variabili del cutset sia variabili residue
+    NON vengono compilati, né verificati dal risolutore. È la stessa lacuna di solve_with_cutset
+    (che non li propaga al residuo), quindi una soluzione restituita può violarli: ad esempio
+    per SEND+MORE=MONEY il vincolo di somma resta fuori dal cutset e non viene controllato.
+    """
+    variables = list(csp_instance.variables)
+    var_index = {var: i for i, var in enumerate(variables)}
+    n_vars = len(variables)
+
+    # 1) id globali dei valori e domini come liste di id
+    values = []
+    value_index = {}
+    domains = []
+    for var in variables:
+        ids = []
+        for value in csp_instance.domains[var]:
+            try:
+                hash(value)
+            except TypeError:
+                raise ValueError(f"valore non hashable nel dominio di {var!r}: {value!r}") from None
+            if value not in value_index:
+                value_index[value] = len(values)
+                values.append(value)
+            ids.append(value_index[value])
+        domains.append(ids)
+    max_domain = max((len(d) for d in domains), default=0)
+    words = max(1, -(-max_domain // WORD_BITS))
+
+    def domain_values(i):
+        return [values[value_id] for value_id in domains[i]]
+
+    # 2) vincoli unari: riduzione delle bitmask dei domini
+    masks = [(1 << len(d)) - 1 for d in domains]
+    binary, nary = [], []
+    for constraint_vars, constraint_func in csp_instance.constraints:
+        scope = [var_index[var] for var in constraint_vars]
+        if len(scope) == 1 or (len(scope) == 2 and scope[0] == scope[1]):
+            # anche un vincolo binario su una sola variabile è di fatto unario
+            i = scope[0]
+            vals = domain_values(i)
+            for pos in list(_iter_bits(masks[i])):
+                if not _holds(constraint_func, *([vals[pos]] * len(scope))):
+                    masks[i] &= ~(1 << pos)
+        elif len(scope) == 2:
+            binary.append((scope, constraint_func))
+        else:
+            nary.append((scope, constraint_func))
+
+    # 3) vincoli binari: per ogni coppia, righe "avanti" indicizzate sulla posizione di a
+    #    che contengono la bitmask delle posizioni di b compatibili
+    scopes = []
+    forward = []
+    pair_ids = {}
+    for (a, b), constraint_func in binary:
+        key = frozenset((a, b))
+        vals_a, vals_b = domain_values(a), domain_values(b)
+        if key in pair_ids:
+            c = pair_ids[key]
+            # vincolo già presente sulla stessa coppia: lo si valuta nell'orientamento memorizzato
+            first, second = scopes[c]
+            if (first, second) != (a, b):
+                func = lambda x, y, f=constraint_func: f(y, x)
+                vals_a, vals_b = vals_b, vals_a
+                a, b = first, second
+            else:
+                func = constraint_func
+        else:
+            c = len(scopes)
+            pair_ids[key] = c
+            scopes.append((a, b))
+            forward.append([(1 << len(domains[b])) - 1] * len(domains[a]))
+            func = constraint_func
+        rows = forward[c]
+        for pos_a in range(len(rows)):
+            row = 0
+            if masks[a] >> pos_a & 1:
+                for pos_b in _iter_bits(rows[pos_a] & masks[b]):
+                    if _holds(func, vals_a[pos_a], vals_b[pos_b]):
+                        row |= 1 << pos_b
+            rows[pos_a] = row
+
+    # righe "indietro": trasposte delle righe avanti
+    backward = []
+    for (a, b), rows in zip(scopes, forward):
+        back = [0] * len(domains[b])
+        for pos_a, row in enumerate(rows):
+            for pos_b in _iter_bits(row):
+                back[pos_b] |= 1 << pos_a
+        backward.append(back)
+
+    def rows_between(i, j):
+        # Righe indicizzate sulla posizione di i con la bitmask delle posizioni di j compatibili
+        c = pair_ids.get(frozenset((i, j)))
+        if c is None:
+            return None
+        return forward[c] if scopes[c][0] == i else backward[c]
+
+    # 4) piano del cutset, calcolato prima delle tabelle n-arie: servono solo quelle interne al cutset
+    if cutset_variables is None:
+        cutset_variables = find_cycle_cutset_min_fill(csp_instance)
+    cutset = [var_index[var] for var in cutset_variables]
+    cutset_index = [-1] * n_vars
+    for k, i in enumerate(cutset):
+        cutset_index[i] = k
+    residual = [i for i in range(n_vars) if cutset_index[i] < 0]
+
+    # il residuo deve essere una foresta, altrimenti la BFS di tree solving ignorerebbe gli archi del ciclo
+    residual_graph = {i: set() for i in residual}
+    for a, b in scopes:
+        if cutset_index[a] < 0 and cutset_index[b] < 0:
+            residual_graph[a].add(b)
+            residual_graph[b].add(a)
+    if not is_graph_acyclic_via_leaf_pruning(residual_graph):
+        raise ValueError("il cutset non rende aciclico il grafo dei vincoli residui")
+
+    # 5) vincoli n-ari interni al cutset: chiave a base mista (prima variabile più significativa) delle
+    #    tuple ammesse, enumerate in ordine lessicografico così che le chiavi risultino già ordinate.
+    #    I vincoli n-ari misti non vengono scritti nel buffer (vedi la docstring).
+    nary_keys = []
+    for scope, constraint_func in nary:
+        in_cutset = sum(cutset_index[i] >= 0 for i in scope)
+        if in_cutset == 0:
+            # tree_solve non gestisce vincoli n-ari nel residuo
+            raise ValueError("il cutset deve contenere almeno una variabile di ogni vincolo n-ario")
+        if in_cutset < len(scope):
+            continue
+        scopes.append(tuple(scope))
+        keys = []
+        nary_keys.append(keys)
+
+        key_space = 1
+        for i in scope:
+            key_space *= len(domains[i])
+        if key_space > WORD_MASK:
+            raise ValueError(f"vincolo n-ario su {len(scope)} variabili troppo grande per chiavi a 64 bit")
+        strides = [0] * len(scope)
+        stride = 1
+        for k in range(len(scope) - 1, -1, -1):
+            strides[k] = stride
+            stride *= len(domains[scope[k]])
+        scope_values = [domain_values(i) for i in scope]
+        # per ogni profondità, le tabelle verso le variabili già fissate dello stesso vincolo
+        prunings = [[(k, rows) for k in range(depth)
+                     for rows in [rows_between(scope[k], scope[depth])] if rows is not None]
+                    for depth in range(len(scope))]
+        positions = [0] * len(scope)
+        # candidati visitati (tuple parziali e complete): il limite scatta prima di enumerare tutto
+        visited = [0]
+
+        def extend(depth, key):
+            visited[0] += 1
+            if visited[0] > max_table_candidates:
+                raise ValueError(f"vincolo n-ario con più di {max_table_candidates} candidati da valutare")
+            if depth == len(scope):
+                if _holds(constraint_func, *[scope_values[k][positions[k]] for k in range(len(scope))]):
+                    keys.append(key)
+                return
+            candidates = masks[scope[depth]]
+            for k, rows in prunings[depth]:
+                candidates &= rows[positions[k]]
+            for pos in _iter_bits(candidates):
+                positions[depth] = pos
+                extend(depth + 1, key + pos * strides[depth])
+
+        extend(0, 0)
+    n_cons = len(scopes)
+
+    # 6) adiacenza in formato CSR costruita sui soli vincoli binari
+    neighbours = [[] for _ in range(n_vars)]
+    for c in range(len(forward)):
+        a, b = scopes[c]
+        neighbours[a].append((b, c))
+        neighbours[b].append((a, c))
+
+    # 7) vincoli interni al cutset e vincoli binari misti da trasformare in unari
+    cutset_cons, mixed_cons = [], []
+    for c, scope in enumerate(scopes):
+        in_cutset = sum(cutset_index[i] >= 0 for i in scope)
+        if in_cutset == len(scope):
+            cutset_cons.append(c)
+        elif len(scope) == 2 and in_cutset == 1:
+            mixed_cons.append(c)
+
+    # 8) serializzazione delle sezioni
+    sections = {
+        'dom_offsets': [0],
+        'dom_values': [value_id for d in domains for value_id in d],
+        'dom_masks': [w for mask in masks for w in _mask_to_words(mask, words)],
+        'scope_offsets': [0],
+        'scopes': [i for scope in scopes for i in scope],
+        'table_offsets': [0],
+        'tables': [],
+        'adj_offsets': [0],
+        'adj_vars': [nb for nbs in neighbours for nb, _ in nbs],
+        'adj_cons': [c for nbs in neighbours for _, c in nbs],
+        'cutset': cutset,
+        'cutset_index': cutset_index,
+        'residual': residual,
+        'cutset_cons': cutset_cons,
+        'mixed_cons': mixed_cons,
+    }
+    for i in range(n_vars):
+        sections['dom_offsets'].append(sections['dom_offsets'][-1] + len(domains[i]))
+        sections['adj_offsets'].append(sections['adj_offsets'][-1] + len(neighbours[i]))
+    tables = sections['tables']
+    for c in range(n_cons):
+        sections['scope_offsets'].append(sections['scope_offsets'][-1] + len(scopes[c]))
+        if c < len(forward):
+            for row in forward[c] + backward[c]:
+                tables.extend(_mask_to_words(row, words))
+        else:
+            tables.extend(nary_keys[c - len(forward)])
+        sections['table_offsets'].append(len(tables))
+
+    payload = []
+    layout = []
+    offset = HEADER.size
+    for name, typecode in SECTIONS:
+        if name == 'labels':
+            data = pickle.dumps((variables, values), protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            data = array(typecode, sections[name]).tobytes()
+        layout.extend((offset, len(data)))
+        padding = -len(data) % 8
+        payload.append(data + b'\0' * padding)
+        offset += len(data) + padding
+    header = HEADER.pack(MAGIC, n_vars, n_cons, words, *layout)
+    return header + b''.join(payload)
+
+
+class CompiledCSP:
+    """
+    Vista in sola lettura su un buffer prodotto da compile_csp (bytes, mmap o memoria condivisa).
+    Le sezioni sono memoryview sul buffer originale: nessuna copia dell'istanza.
+    """
+
+    def __init__(self, buffer, resource=None):
+        self._resource = resource
+        self._buffer = memoryview(buffer).toreadonly()
+        header = HEADER.unpack_from(self._buffer)
+        if header[0] != MAGIC:
+            raise ValueError("il buffer non contiene un CSP compilato")
+        self.n_vars, self.n_cons, self.words = header[1:4]
+        self._views = []
+        for k, (name, typecode) in enumerate(SECTIONS):
+            offset, length = header[4 + 2 * k], header[5 + 2 * k]
+            view = self._buffer[offset:offset + length]
+            if typecode != 'B':
+                view = view.cast(typecode)
+            self._views.append(view)
+            setattr(self, '_' + name, view)
+        self._labels_cache = None
+        self._cutset_choices = None
+
+    @classmethod
+    def from_file(cls, path):
+        # Il file viene mappato in sola lettura: più processi condividono le stesse pagine
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, resource=mapped)
+
+    def close(self):
+        # Le memoryview vanno rilasciate prima di chiudere la risorsa sottostante
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._buffer.release()
+        if self._resource is not None:
+            self._resource.close()
+            self._resource = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- accesso alle sezioni ---
+
+    def _words_at(self, view, start):
+        if self.words == 1:
+            return view[start]
+        mask = 0
+        for w in range(self.words):
+            mask |= view[start + w] << (WORD_BITS * w)
+        return mask
+
+    def domain_size(self, var_id):
+        return self._dom_offsets[var_id + 1] - self._dom_offsets[var_id]
+
+    def domain_mask(self, var_id):
+        return self._words_at(self._dom_masks, var_id * self.words)
+
+    def domain_masks(self):
+        # Copia mutabile delle bitmask: è lo stato di lavoro di una singola assegnazione del cutset
+        if self.words == 1:
+            return self._dom_masks.tolist()
+        return [self.domain_mask(i) for i in range(self.n_vars)]
+
+    def scope(self, cons_id):
+        # Copia in tupla: una memoryview restituita impedirebbe di chiudere il buffer
+        return tuple(self._scopes[self._scope_offsets[cons_id]:self._scope_offsets[cons_id + 1]])
+
+    def row(self, cons_id, var_id, pos):
+        """
+        Bitmask delle posizioni dell'altra variabile del vincolo binario cons_id
+        compatibili con var_id fissata alla posizione pos.
+        """
+        start = self._table_offsets[cons_id]
+        first = self._scopes[self._scope_offsets[cons_id]]
+        if var_id != first:
+            start += self.domain_size(first) * self.words
+        return self._words_at(self._tables, start + pos * self.words)
+
+    def allows(self, cons_id, positions):
+        # positions: posizioni nel dominio delle variabili del vincolo, nell'ordine dello scope
+        scope = self.scope(cons_id)
+        if len(scope) == 2:
+            return self.row(cons_id, scope[0], positions[0]) >> positions[1] & 1 == 1
+        key = 0
+        for i, pos in zip(scope, positions):
+            key = key * self.domain_size(i) + pos
+        lo, hi = self._table_offsets[cons_id], self._table_offsets[cons_id + 1]
+        k = bisect.bisect_left(self._tables, key, lo, hi)
+        return k < hi and self._tables[k] == key
+
+    def neighbours(self, var_id):
+        # Coppie (vicino, id del vincolo binario)
+        lo, hi = self._adj_offsets[var_id], self._adj_offsets[var_id + 1]
+        return list(zip(self._adj_vars[lo:hi].tolist(), self._adj_cons[lo:hi].tolist()))
+
+    # --- piano del cutset ---
+
+    @property
+    def cutset(self):
+        return self._cutset
+
+    @property
+    def residual(self):
+        return self._residual
+
+    @property
+    def cutset_index(self):
+        return self._cutset_index
+
+    @property
+    def cutset_cons(self):
+        return self._cutset_cons
+
+    @property
+    def mixed_cons(self):
+        return self._mixed_cons
+
+    def cutset_choices(self):
+        # Per ogni variabile del cutset, le posizioni del dominio sopravvissute ai vincoli unari
+        if self._cutset_choices is None:
+            self._cutset_choices = [list(_iter_bits(self.domain_mask(i))) for i in self._cutset]
+        return self._cutset_choices
+
+    def cutset_combinations(self):
+        total = 1
+        for choices in self.cutset_choices():
+            total *= len(choices)
+        return total
+
+    def _labels_decoded(self):
+        # I nomi servono solo per tradurre la soluzione: si decodificano al primo uso
+        if self._labels_cache is None:
+            self._labels_cache = pickle.loads(self._labels)
+        return self._labels_cache
+
+    def variable_name(self, var_id):
+        return self._labels_decoded()[0][var_id]
+
+    def decode(self, assignment):
+        # assignment: posizione nel dominio per ogni variabile -> dict nome -> valore
+        variables, values = self._labels_decoded()
+        return {variables[i]: values[self._dom_values[self._dom_offsets[i] + pos]]
+                for i, pos in assignment.items()}
+
+
+def _attach_shared_memory(name):
+    try:
+        # Python >= 3.13: il processo che si collega non deve registrare il blocco nel resource tracker,
+        # altrimenti alla sua uscita il blocco verrebbe rimosso
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Versioni precedenti: i worker di multiprocessing condividono il resource tracker del processo padre
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedCompiledCSP(CompiledCSP):
+    """
+    CSP compilato dentro un blocco multiprocessing.shared_memory.
+    create() compila e copia il buffer nel blocco (il processo che lo crea ne è proprietario e lo rimuove
+    alla chiusura); attach(name) si collega a un blocco esistente senza copiarlo.
+    """
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._owner = owner
+        super().__init__(shm.buf)
+
+    @classmethod
+    def create(cls, csp_instance, **compile_options):
+        data = compile_csp(csp_instance, **compile_options)
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_attach_shared_memory(name), owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        if self._shm is None:
+            return
+        shm, self._shm = self._shm, None
+        try:
+            # la rimozione del nome avviene prima della chiusura, così il blocco non resta in /dev/shm
+            # anche se la chiusura fallisce
+            if self._owner:
+                shm.unlink()
+        finally:
+            super().close()
+            shm.close()
+
+
+def _check_cutset(compiled, cutset_positions):
+    # Verifica i vincoli che coinvolgono solo variabili del cutset
+    cutset_index = compiled.cutset_index
+    for c in compiled.cutset_cons:
+        positions = [cutset_positions[cutset_index[i]] for i in compiled.scope(c)]
+        if not compiled.allows(c, positions):
+            return False
+    return True
+
+def _tree_solve_compiled(compiled, masks):
+    """
+    TREE-CSP-SOLVER sul residuo usando le bitmask: per ogni componente BFS dalla prima variabile residua,
+    passata bottom-up (arc consistency parent <- child) e passata top-down scegliendo il bit più basso.
+    Restituisce dict var_id -> posizione oppure None.
+    """
+    cutset_index = compiled.cutset_index
+    assignment = {}
+    for root in compiled.residual:
+        if root in assignment:
+            continue
+        parent = {root: (None, None)}
+        bfs_order = [root]
+        k = 0
+        while k < len(bfs_order):
+            node = bfs_order[k]
+            k += 1
+            for neighbour, c in compiled.neighbours(node):
+                if cutset_index[neighbour] < 0 and neighbour not in parent:
+                    parent[neighbour] = (node, c)
+                    bfs_order.append(neighbour)
+
+        # passata bottom-up: i figli vengono prima dei padri
+        for node in reversed(bfs_order[1:]):
+            node_parent, c = parent[node]
+            child_mask = masks[node]
+            supported = 0
+            for pos in _iter_bits(masks[node_parent]):
+                if compiled.row(c, node_parent, pos) & child_mask:
+                    supported |= 1 << pos
+            if not supported:
+                return None
+            masks[node_parent] = supported
+
+        # passata top-down: assegnamento senza backtracking
+        if not masks[root]:
+            return None
+        assignment[root] = _lowest_bit(masks[root])
+        for node in bfs_order[1:]:
+            node_parent, c = parent[node]
+            candidates = masks[node] & compiled.row(c, node_parent, assignment[node_parent])
+            if not candidates:
+                return None
+            assignment[node] = _lowest_bit(candidates)
+    return assignment
+
+def solve_compiled_range(compiled, start, stop):
+    """
+    Cutset conditioning sulle assegnazioni del cutset di indice [start, stop), nello stesso ordine di
+    itertools.product usato da solve_with_cutset. Restituisce la prima soluzione trovata come
+    dict var_id -> posizione nel dominio, oppure None.
+    """
+    cutset = compiled.cutset
+    choices = compiled.cutset_choices()
+    for index in range(start, stop):
+        # decodifica dell'indice in base mista (l'ultima variabile del cutset varia più velocemente)
+        cutset_positions = [0] * len(cutset)
+        for k in range(len(cutset) - 1, -1, -1):
+            index, digit = divmod(index, len(choices[k]))
+            cutset_positions[k] = choices[k][digit]
+        if not _check_cutset(compiled, cutset_positions):
+            continue
+
+        # i vincoli binari misti riducono i domini delle variabili residue
+        masks = compiled.domain_masks()
+        cutset_index = compiled.cutset_index
+        consistent = True
+        for c in compiled.mixed_cons:
+            a, b = compiled.scope(c)
+            if cutset_index[a] >= 0:
+                fixed, free = a, b
+            else:
+                fixed, free = b, a
+            masks[free] &= compiled.row(c, fixed, cutset_positions[cutset_index[fixed]])
+            if not masks[free]:
+                consistent = False
+                break
+        if not consistent:
+            continue
+
+        residual_assignment = _tree_solve_compiled(compiled, masks)
+        if residual_assignment is not None:
+            solution = {i: cutset_positions[k] for k, i in enumerate(cutset)}
+            solution.update(residual_assignment)
+            return solution
+    return None
+
+
+# Istanza compilata a cui è collegato il processo worker
+_worker_compiled = None
+
+def _init_worker(name):
+    global _worker_compiled
+    _worker_compiled = SharedCompiledCSP.attach(name)
+
+def _solve_range_worker(bounds):
+    return solve_compiled_range(_worker_compiled, *bounds)
+
+def solve_with_cutset_parallel(csp_instance, processes=None, chunk_size=None, **compile_options):
+    """
+    Come solve_with_cutset, ma le assegnazioni del cutset vengono distribuite su un pool di processi.
+    L'istanza viene compilata una sola volta in memoria condivisa e ogni worker vi si collega senza copiarla.
+    I blocchi vengono raccolti in ordine, quindi le assegnazioni del cutset sono provate nello stesso ordine
+    di solve_with_cutset. La soluzione coincide con quella sequenziale quando ogni coppia di variabili ha al
+    più un vincolo binario: compile_csp fonde i vincoli sulla stessa coppia, mentre tree_solve tiene solo l'ultimo.
+    """
+    print("Variabili CSP:", csp_instance.variables)
+    with SharedCompiledCSP.create(csp_instance, **compile_options) as compiled:
+        print("Cutset (min-fill):", [compiled.variable_name(i) for i in compiled.cutset])
+        total = compiled.cutset_combinations()
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if chunk_size is None:
+            chunk_size = max(1, total // (processes * 16))
+        with Pool(processes, initializer=_init_worker, initargs=(compiled.name,)) as pool:
+            ranges = ((start, min(start + chunk_size, total)) for start in range(0, total, chunk_size))
+            for solution in pool.imap(_solve_range_worker, ranges):
+                if solution is not None:
+                    complete_solution = compiled.decode(solution)
+                    print("==> Soluzione completa trovata:", complete_solution)
+                    return complete_solution
+
+    print("Nessuna soluzione trovata per nessuna assegnazione del cutset.")
+    return None